@@ -49,6 +49,7 @@ def _():
     from src.utils.m_nb_results_to_gold_export import f_nb_results_to_gold_export, f_list_gold_tables
     from src.utils.m_query_database import f_query_database
     from src.utils.m_sbi_classifier import f_split_by_sbi
+    from src.data_engineering.data_loader_bronze import find_raw_table
 
     # Settings
     pl.Config(
@@ -96,6 +97,7 @@ def _():
         f_list_gold_tables,
         f_nb_results_to_gold_export,
         f_split_by_sbi,
+        find_raw_table,
         pd,
         pl,
         plt,
@@ -183,7 +185,7 @@ def _(mo):
 
 
 @app.cell
-def _(DIR_DATA_RAW, Path, df_baseline, f_split_by_sbi, pl):
+def _(DIR_DATA_RAW, Path, df_baseline, f_split_by_sbi, find_raw_table, pl):
     # --- Old approach: manual filtering per SBI level ---
     # df_total = df_baseline.filter(pl.col("sbi_code") == "T001081")
     # df_sbi_lvl1 = df_baseline.filter(pl.col("sbi_title").str.to_uppercase().str.contains(r"^[A-U]\s"))
@@ -191,9 +193,10 @@ def _(DIR_DATA_RAW, Path, df_baseline, f_split_by_sbi, pl):
 
     # --- New approach: automated split using f_split_by_sbi ---
     # The function auto-detects CBS internal keys and splits into one DataFrame
-    # per hierarchy level using the CBS dimension JSON as reference.
+    # per hierarchy level using the raw CBS dimension table as reference.
     # Note: f_split_by_sbi works with pandas, so we convert Polars -> Pandas -> Polars.
-    dim_json_path = Path(DIR_DATA_RAW) / "80072ned" / "BedrijfskenmerkenSBI2008.json"
+    # The raw loader stores the dimension as Parquet (or gzipped JSON); find_raw_table resolves whichever exists.
+    dim_json_path = find_raw_table(Path(DIR_DATA_RAW) / "80072ned", "BedrijfskenmerkenSBI2008")
 
     sbi_splits = f_split_by_sbi(
         df=df_baseline.to_pandas(),
@@ -161,11 +161,16 @@ CBS_PRESETS: dict[str, list[str]] = {
 # DERIVED CONSTANTS (backward-compatible with existing loaders)
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Every registry table, in registry order — what the raw/bronze/silver loaders
+# process.  Registry keys are unique, so no cross-list dedup is needed.  Tuples
+# (not lists) so derived constants cannot be mutated by an importing module.
+CBS_TABLES_ALL: tuple[str, ...] = tuple(CBS_TABLE_REGISTRY)
+
 # All quarterly tables to process (including target)
-CBS_TABLES_TO_LOAD = [
+CBS_TABLES_TO_LOAD: tuple[str, ...] = tuple(
     tid for tid, meta in CBS_TABLE_REGISTRY.items()
     if meta["frequency"] == "quarterly"
-]
+)
 
 # All yearly feature tables with their publication lag
 CBS_TABLES_YEARLY: dict[str, int] = {
@@ -1,45 +1,108 @@
+import gzip
+import hashlib
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 
 # --- Third Party Libraries ---
-from sqlalchemy import create_engine, insert, MetaData, Table, Column, String, Integer, Float
+import pandas as pd
+import pyarrow.parquet as pq
+from sqlalchemy import MetaData, Table, Column, String, Integer, Float, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.pool import StaticPool
 
 # --- Configuration ---
-from src.config import DIR_DATA_RAW, DIR_DB_BRONZE, CBS_TABLES_TO_LOAD, CBS_TABLES_YEARLY
-try:
-    from src.config import CBS_TABLES_MONTHLY
-except ImportError:
-    CBS_TABLES_MONTHLY: dict = {}
+from src.config import DIR_DATA_RAW, DIR_DB_BRONZE, CBS_TABLES_ALL
 
 # --- Logging ---
 from src.utils.m_log import f_log
+from src.utils.m_sqlite import create_sqlite_engine
 
 
-def infer_primary_key(file_name: str, data_sample: dict) -> str:
-    """Determines the Primary Key Name from the data sample."""
+RAW_FILE_SUFFIXES = (".parquet", ".json.gz", ".json")
+INGEST_LOG_TABLE = "_bronze_ingest_log"
+
+
+def raw_table_stem(raw_path: Path) -> str | None:
+    """Name of a raw (meta)data table without its file suffix (e.g. 'Perioden.json.gz' -> 'Perioden'), None for other files."""
+    suffix = next((s for s in RAW_FILE_SUFFIXES if raw_path.name.endswith(s)), None)
+    return raw_path.name[:-len(suffix)] if suffix else None
+
+def find_raw_table(folder: Path, stem: str) -> Path:
+    """Path of the raw (meta)data table ``stem`` in ``folder``, in whichever raw file format it was stored."""
+    for suffix in RAW_FILE_SUFFIXES:
+        raw_path = Path(folder, stem + suffix)
+        if raw_path.is_file():
+            return raw_path
+    raise FileNotFoundError(f"No raw table '{stem}' ({', '.join(RAW_FILE_SUFFIXES)}) found in {folder}")
+
+def read_raw_table(raw_path: Path) -> pd.DataFrame:
+    """
+    Reads a raw CBS table (Parquet, gzipped fallback JSON or legacy plain JSON) straight into a DataFrame.
+    Parquet is converted column-wise from Arrow, so no per-row dict is ever built; JSON is decoded from a single bytes blob.
+    Integer columns with nulls keep their Python ints (object dtype) instead of being widened to float, so
+    ``infer_column_type`` can still map them to INTEGER.
+    """
+    if raw_path.suffix == ".parquet":
+        return pq.read_table(raw_path).to_pandas(integer_object_nulls=True)
+    payload = raw_path.read_bytes()
+    if raw_path.suffix == ".gz":
+        payload = gzip.decompress(payload)
+    return pd.DataFrame(json.loads(payload), dtype=object)
+
+def file_sha256(raw_path: Path) -> str:
+    """Content hash of a raw file, used to detect unchanged sources between runs."""
+    return hashlib.sha256(raw_path.read_bytes()).hexdigest()
+
+def read_raw_tables(raw_paths: list[Path], max_workers: int = 8) -> dict[Path, pd.DataFrame]:
+    """
+    Reads all raw files of one CBS table concurrently, so a folder costs the slowest read instead of the sum of all reads.
+    The Parquet/file I/O releases the GIL; files that fail to read are logged and left out of the result.
+    """
+    def _read(raw_path: Path):
+        try:
+            return read_raw_table(raw_path)
+        except Exception as e:
+            f_log(f"Failed to read {raw_path}: {e}", c_type="error")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = dict(zip(raw_paths, executor.map(_read, raw_paths)))
+    return {raw_path: df for raw_path, df in frames.items() if df is not None}
+
+def infer_primary_key(file_name: str, columns) -> str:
+    """Determines the Primary Key Name from the column names."""
     potential_keys = ["ID", "Key", "DimensionKey"]
-    primary_key = next((k for k in potential_keys if k in data_sample), None)
+    primary_key = next((k for k in potential_keys if k in columns), None)
     if not primary_key:
         f_log(f"No ID found in {file_name}, skipping table insertion.", c_type="error")
         return None
     return primary_key
 
-def clean_bronze_data(file_name: str, data: list, primary_key: str) -> list:
-    """Cleans string fields by stripping whitespace and add key columns."""
-    cleaned_data = []
-    for record in data:
-        clean_record = {k: (v.strip() if isinstance(v, str) else v) for k, v in record.items()}
-        pk = clean_record.get(primary_key)
-        clean_record["bronze_pk"] = f"{file_name}_{pk}"
-        clean_record["_source_file"] = file_name
-        cleaned_data.append(clean_record)
-    return cleaned_data
-
-def infer_column_type(value):
-    """Simple type inference for 'Raw' data integrity."""
-    if isinstance(value, int):
+def clean_bronze_data(file_name: str, df: pd.DataFrame, primary_key: str) -> pd.DataFrame:
+    """Cleans string fields by stripping whitespace and add key columns, as vectorized column operations (in place)."""
+    for col in df.select_dtypes(include="object").columns:
+        if pd.api.types.infer_dtype(df[col], skipna=True) not in ("string", "mixed", "mixed-integer"):
+            continue
+        # .str.strip() yields NaN for non-string cells; restore those original values.
+        stripped = df[col].str.strip()
+        df[col] = stripped.where(stripped.notna(), df[col])
+    df["bronze_pk"] = f"{file_name}_" + df[primary_key].astype(str)
+    df["_source_file"] = file_name
+    return df
+
+def infer_column_type(series: pd.Series):
+    """
+    Widest compatible SQL type over ALL values of a column (nulls ignored), so a leading None no longer decides the type:
+    only ints/bools -> Integer, ints and/or floats -> Float, anything else (strings, mixed, all-null) -> String.
+    """
+    inferred = pd.api.types.infer_dtype(series, skipna=True)
+    if inferred in ("integer", "boolean"):
         return Integer
-    if isinstance(value, float):
+    if inferred in ("floating", "mixed-integer-float", "decimal"):
         return Float
     return String
 
@@ -53,72 +116,161 @@ class DatabaseBronze:
         self.data_raw_path = data_raw_path
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.engine = create_engine(f"sqlite:///{self.db_path.as_posix()}")
+        # Folders are ingested one after another (also when driven by the raw downloader's callback, which runs in the
+        # calling thread), so a single reused connection serves every ingest.
+        self.engine = create_sqlite_engine(self.db_path, poolclass=StaticPool)
         self.metadata = MetaData()
+        # Source hash and size per bronze table of the last successful load; unchanged raw files are not re-ingested.
+        self.ingest_log = Table(
+            INGEST_LOG_TABLE, self.metadata,
+            Column("table_name", String, primary_key=True),
+            Column("source_sha256", String),
+            Column("source_size", Integer),
+            Column("loaded_at", String),
+        )
 
 
-    def ingest_0_raw_folder(self, identifier: str):
-        """Scans a specific identifier folder and ingests Fact and Dimension .json files."""
+    def ingest_0_raw_folder(self, identifier: str, force: bool = False):
+        """
+        Scans a specific identifier folder and ingests Fact and Dimension .parquet/.json.gz/.json files.
+        Unless ``force`` is set, a file is skipped when it was last modified before its table's last successful load
+        and still has the size of that load (a stat only), or else when its content hash matches that load. A file
+        restored with an older mtime and the same size but different content needs ``force=True``.
+        Empty (0-byte) files are ignored.
+        """
         folder_path = Path(self.data_raw_path, identifier)
         if not folder_path.exists():
             f_log(f"Identifier folder {identifier} not found in {self.data_raw_path}", c_type="error")
             return
 
-        for json_path in folder_path.glob("*.json"):
-            if json_path.name == "TypedDataSet.json":
-                table_name = f"{identifier}_fact"
-            else:
-                table_name = f"{identifier}_dim_{json_path.stem}"
+        # os.scandir yields the stat info with each entry; Path objects are only built for relevant files.
+        table_names, stats = {}, {}
+        with os.scandir(folder_path) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                stem = raw_table_stem(Path(entry.name))
+                if stem is None or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                if stat.st_size == 0:
+                    f_log(f"Skipping empty raw file {entry.path}", c_type="warning")
+                    continue
+                raw_path = Path(entry.path)
+                stats[raw_path] = stat
+                if stem == "TypedDataSet":
+                    table_names[raw_path] = f"{identifier}_fact"
+                else:
+                    table_names[raw_path] = f"{identifier}_dim_{stem}"
 
-            self.insert_json_data(json_path, table_name)
+        # One connection and one transaction (a single commit/WAL sync) for the fact and all dimension tables.
+        with self.engine.begin() as conn:
+            self._create_ingest_log(conn)
+            loaded = {
+                table_name: (sha, size, datetime.fromisoformat(loaded_at).timestamp())
+                for table_name, sha, size, loaded_at in conn.execute(
+                    select(
+                        self.ingest_log.c.table_name, self.ingest_log.c.source_sha256,
+                        self.ingest_log.c.source_size, self.ingest_log.c.loaded_at,
+                    )
+                    .where(self.ingest_log.c.table_name.in_(table_names.values()))
+                ).all()
+            }
 
-    def insert_json_data(self, json_path: Path, table_name: str):
-        """Reads JSON, dynamically creates table based on keys, and bulk inserts."""
-        try:
-            with open(json_path, 'r') as f:
-                data = json.load(f)          
-            if not data:
-                return
-            
-        except Exception as e:
-            f_log(f"Failed to read {json_path}: {e}", c_type="error")
-            return
+            source_hashes = {}
+            for raw_path, table_name in table_names.items():
+                stat = stats[raw_path]
+                if (not force and table_name in loaded
+                        and stat.st_size == loaded[table_name][1] and stat.st_mtime < loaded[table_name][2]):
+                    f_log(f"{table_name} not modified since last load, skipping.", c_type="info")
+                    continue
+                sha = file_sha256(raw_path)
+                if not force and table_name in loaded and loaded[table_name][0] == sha:
+                    f_log(f"{table_name} unchanged since last load, skipping.", c_type="info")
+                    continue
+                source_hashes[raw_path] = sha
+
+            for raw_path, df in read_raw_tables(list(source_hashes)).items():
+                table_name = table_names[raw_path]
+                if self.insert_raw_data(conn, df, raw_path.name, table_name):
+                    self._record_ingest(conn, table_name, source_hashes[raw_path], stats[raw_path].st_size)
+
+    def _create_ingest_log(self, conn: Connection):
+        """Creates the ingest log, adding the source_size column to logs written before it existed."""
+        self.ingest_log.create(conn, checkfirst=True)
+        columns = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({INGEST_LOG_TABLE})")}
+        if "source_size" not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE {INGEST_LOG_TABLE} ADD COLUMN source_size INTEGER")
+
+    def _record_ingest(self, conn: Connection, table_name: str, source_sha256: str, source_size: int):
+        """Upserts the source hash and size of a successfully loaded bronze table into the ingest log."""
+        stmt = sqlite_insert(self.ingest_log).values(
+            table_name=table_name,
+            source_sha256=source_sha256,
+            source_size=source_size,
+            loaded_at=datetime.now(timezone.utc).isoformat(),
+        )
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=[self.ingest_log.c.table_name],
+            set_={
+                "source_sha256": stmt.excluded.source_sha256,
+                "source_size": stmt.excluded.source_size,
+                "loaded_at": stmt.excluded.loaded_at,
+            },
+        ))
+
+    def insert_raw_data(self, conn: Connection, df: pd.DataFrame, file_name: str, table_name: str) -> bool:
+        """
+        Dynamically creates a table for a raw Parquet/JSON DataFrame based on its keys, and bulk inserts on ``conn``.
+        Returns True when the source is fully handled (loaded, or empty), False when it was not loaded.
+        """
+        if df.empty:
+            return True
 
-        file_name = json_path.name
-        data_sample = data[0]
         columns = []
 
-        primary_key = infer_primary_key(file_name, data_sample)
+        primary_key = infer_primary_key(file_name, df.columns)
         if not primary_key:
-            return
+            return False
 
-        cleaned_data = clean_bronze_data(file_name, data, primary_key)   
+        df = clean_bronze_data(file_name, df, primary_key)
       
         columns.append(Column("bronze_pk", String, primary_key=True))
-        for key, value in cleaned_data[0].items():
+        for key, series in df.items():
             if key == "bronze_pk":
                 continue
-            col_type = infer_column_type(value)
+            col_type = infer_column_type(series)
             columns.append(Column(key, col_type, primary_key=False))
 
-        table = Table(table_name, self.metadata, *columns, extend_existing=True)
-        table.drop(self.engine, checkfirst=True)
-        table.create(self.engine)
+        # Drop the definition of an earlier ingest in this process, so the table has exactly the current columns
+        # (extend_existing would keep columns the source no longer has).
+        if table_name in self.metadata.tables:
+            self.metadata.remove(self.metadata.tables[table_name])
+        table = Table(table_name, self.metadata, *columns)
+        table.drop(conn, checkfirst=True)
+        table.create(conn)
 
-        with self.engine.begin() as conn:
-            try:
-                conn.execute(insert(table), cleaned_data)
-                f_log(f"Loaded {len(cleaned_data)} rows into {table_name}", c_type="success")
-            except Exception as e:
-                f_log(f"Bulk insert failed for {table_name}: {e}", c_type="error")
+        # Positional executemany on the DBAPI cursor: one prepared statement, no per-row Core compilation/dict binding.
+        col_names = [c.name for c in table.columns]
+        quote = self.engine.dialect.identifier_preparer.quote
+        insert_sql = (
+            f"INSERT INTO {quote(table_name)} ({', '.join(quote(c) for c in col_names)}) "
+            f"VALUES ({', '.join('?' * len(col_names))})"
+        )
+
+        try:
+            # Column-wise (SoA) value lists zipped lazily into rows: no per-row dict/tuple list is materialized.
+            # Missing values (NaN/None) are bound as SQL NULL.
+            column_values = [df[c].astype(object).where(df[c].notna(), None).tolist() for c in col_names]
+            cursor = conn.connection.cursor()
+            cursor.executemany(insert_sql, zip(*column_values))
+            cursor.close()
+            f_log(f"Loaded {len(df)} rows into {table_name}", c_type="success")
+            return True
+        except Exception as e:
+            f_log(f"Bulk insert failed for {table_name}: {e}", c_type="error")
+            return False
 
 
 if __name__ == "__main__":
     db = DatabaseBronze(DIR_DATA_RAW, DIR_DB_BRONZE)
-    all_tables = list(dict.fromkeys(
-        list(CBS_TABLES_TO_LOAD)
-        + list(CBS_TABLES_YEARLY)
-        + list(CBS_TABLES_MONTHLY)
-    ))
-    for table_id in all_tables:
+    for table_id in CBS_TABLES_ALL:
         db.ingest_0_raw_folder(table_id)
\ No newline at end of file
@@ -5,20 +5,17 @@ Formats tables from silver into clean numerical timeseries features ready for ML
 from pathlib import Path
 
 # --- Third Party Libraries ---
+import numpy as np
 import pandas as pd
-from sqlalchemy import MetaData, create_engine, text
+from sqlalchemy import MetaData
+from sqlalchemy.pool import StaticPool
 
 # --- Configuration ---
-from src.config import DIR_DB_SILVER, DIR_DB_GOLD, DIR_FEATURE_SELECTION, ML_TARGET_COLUMN, CBS_TABLES_TO_LOAD, CBS_TABLES_YEARLY, DATA_START_YEAR
-try:
-    from src.config import CBS_TABLES_MONTHLY
-except ImportError:
-    # Backwards-compatible default — keeps the loader runnable for users
-    # who haven't yet added CBS_TABLES_MONTHLY to their config.py.
-    CBS_TABLES_MONTHLY: dict = {}
+from src.config import DIR_DB_SILVER, DIR_DB_GOLD, DIR_FEATURE_SELECTION, ML_TARGET_COLUMN, CBS_TABLES_ALL, CBS_TABLES_TO_LOAD, CBS_TABLES_YEARLY, CBS_TABLES_MONTHLY, DATA_START_YEAR
 
 # --- Logging ---
 from src.utils.m_log import f_log
+from src.utils.m_sqlite import create_sqlite_engine
 
 
 class DatabaseGold:
@@ -30,7 +27,9 @@ class DatabaseGold:
         self.db_silver_path = Path(db_silver_path)
         self.db_gold_path = Path(db_gold_path)
         self.db_gold_path.parent.mkdir(parents=True, exist_ok=True)
-        self.engine = create_engine(f"sqlite:///{self.db_gold_path.as_posix()}")
+        # The gold build is sequential, so a single connection (StaticPool) serves every table and the master dataset:
+        # the bulk pragmas are applied once and the page cache stays warm across process_silver_table calls.
+        self.engine = create_sqlite_engine(self.db_gold_path, poolclass=StaticPool)
         self.metadata = MetaData()
 
 
@@ -41,35 +40,45 @@ class DatabaseGold:
 
         f_log(f"Processing {silver_table_name} -> {gold_table_name}", c_type="process")
 
-        with self.engine.connect() as conn:
-            conn.execute(text("ATTACH DATABASE :silver_path AS silver"), {"silver_path": str(self.db_silver_path)})
-            
+        # Read and write on the raw sqlite3 connection: pandas then binds/fetches rows with sqlite3 directly instead of
+        # wrapping every row in SQLAlchemy, which makes the to_sql write several times faster.
+        raw_conn = self.engine.raw_connection()
+        try:
+            sqlite_conn = raw_conn.driver_connection
+            sqlite_conn.execute("ATTACH DATABASE ? AS silver", (str(self.db_silver_path),))
             try:
                 query = f"SELECT * FROM silver.\"{silver_table_name}\""
-                df = pd.read_sql_query(query, conn)
+                df = pd.read_sql_query(query, sqlite_conn)
             except Exception as e:
                 f_log(f"Error fetching {silver_table_name}: {e}", c_type="error")
                 return
             finally:
-                conn.execute(text("DETACH DATABASE silver"))
+                sqlite_conn.execute("DETACH DATABASE silver")
 
-        try:
-            df_gold = transformation_func(df)
-            
-            # --- CENTRALISED GOLD QUALITY GATE ---
-            # Enforce zero-nulls and float64 type casting universally
-            numeric_cols = df_gold.select_dtypes(include=['number']).columns
-            df_gold[numeric_cols] = df_gold[numeric_cols].astype('float64')
-
-            f_log(f"Gold Quality Gate: Processed {len(df_gold)} rows. 0 NaNs remain.", c_type="success")
-            
-            # Persist to Gold securely inside the explicit try-block to catch SQLite layout boundaries cleanly
-            df_gold.to_sql(gold_table_name, self.engine, if_exists='replace', index=False)
-            f_log(f"Stored {gold_table_name}", c_type="store")
-            
-        except Exception as e:
-            f_log(f"Error transforming/storing {silver_table_name}: {e}", c_type="error")
-            return
+            try:
+                df_gold = transformation_func(df)
+
+                # --- CENTRALISED GOLD QUALITY GATE ---
+                # Enforce zero-nulls and float64 type casting universally
+                numeric_cols = df_gold.select_dtypes(include=['number']).columns
+                df_gold[numeric_cols] = df_gold[numeric_cols].astype('float64')
+
+                f_log(f"Gold Quality Gate: Processed {len(df_gold)} rows. 0 NaNs remain.", c_type="success")
+
+                # Persist to Gold with the declared types and datetime text of the SQLAlchemy engine. The replace is
+                # not atomic: pandas drops the old table outside this transaction, so the rollback below only
+                # discards a partial write and a failed table has to be rebuilt.
+                df_sql, sql_dtype = prepare_gold_sql_frame(df_gold)
+                df_sql.to_sql(gold_table_name, sqlite_conn, if_exists='replace', index=False, dtype=sql_dtype)
+                sqlite_conn.commit()
+                f_log(f"Stored {gold_table_name}", c_type="store")
+
+            except Exception as e:
+                sqlite_conn.rollback()
+                f_log(f"Error transforming/storing {silver_table_name}: {e}", c_type="error")
+                return
+        finally:
+            raw_conn.close()  # hands the shared connection back to the pool; it stays open
 
     def create_master_training_dataset(self, target_prefix: str = "80072ned") -> pd.DataFrame:
         """
@@ -115,11 +124,7 @@ class DatabaseGold:
                 return master_df
 
             excluded = {target_table_name}
-            active_gold_tables = (
-                {f"{tid}_gold" for tid in CBS_TABLES_TO_LOAD}
-                | {f"{tid}_gold" for tid in CBS_TABLES_YEARLY}
-                | {f"{tid}_gold" for tid in CBS_TABLES_MONTHLY}
-            )
+            active_gold_tables = {f"{tid}_gold" for tid in CBS_TABLES_ALL}
             feature_table_names = [
                 t for t in tables['name'].tolist()
                 if t.endswith("_gold") and t not in excluded and t in active_gold_tables
@@ -188,6 +193,21 @@ class DatabaseGold:
         return master_df
 
 
+# Declared column types SQLAlchemy's to_sql gives each dtype kind; pandas' sqlite3 fallback would use REAL/TIMESTAMP.
+GOLD_SQL_TYPES = {"f": "FLOAT", "i": "BIGINT", "u": "BIGINT", "b": "BOOLEAN", "M": "DATETIME"}
+
+def prepare_gold_sql_frame(df: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, str]]:
+    """
+    Prepares a Gold table for ``to_sql`` on a raw sqlite3 connection with the schema the SQLAlchemy engine wrote:
+    the declared type per column, and datetimes as SQLAlchemy's '%Y-%m-%d %H:%M:%S.%f' text (NaT stays NULL).
+    """
+    dtype = {col: GOLD_SQL_TYPES.get(df[col].dtype.kind, "TEXT") for col in df.columns}
+    datetime_cols = [col for col, sql_type in dtype.items() if sql_type == "DATETIME"]
+    if datetime_cols:
+        df = df.assign(**{col: df[col].dt.strftime("%Y-%m-%d %H:%M:%S.%f") for col in datetime_cols})
+    return df, dtype
+
+
 def synthesize_master_features(
     master_df: pd.DataFrame,
     feature_dfs: dict[str, pd.DataFrame],
@@ -278,6 +298,21 @@ def synthesize_master_features(
     return master_df, sbi_joined, broadcast_joined, column_origin
 
 
+def parse_quarter_enddates(periods: pd.Series) -> pd.Series:
+    """
+    Vectorized parse of CBS quarter codes ('YYYYKWqq') into quarter end dates (e.g. '2020KW01' -> 2020-03-31).
+    Surrounding whitespace is tolerated (e.g. '2020KW01 '), as with the int() parse of the split parts.
+    Values that are not a valid quarter code (missing, 'KW00', 'KW05', ...) become NaT.
+    """
+    parts = periods.astype(str).str.extract(r'^\s*(\d+)\s*KW\s*(\d+)\s*$')
+    quarter_end_month = pd.DataFrame({
+        'year': pd.to_numeric(parts[0]),
+        'month': pd.to_numeric(parts[1]) * 3,
+        'day': 1,
+    })
+    return pd.to_datetime(quarter_end_month, errors='coerce') + pd.offsets.MonthEnd(0)
+
+
 def apply_gold_baseline(
     df: pd.DataFrame,
     ml_target_col: str = None,
@@ -303,17 +338,24 @@ def apply_gold_baseline(
           - "last" : end-of-period stock variables (vacancies open at quarter close)
           - "first": rarely useful — provided for symmetry
         Only applied to tables that are purely monthly (have MM, no KW).
-    """
-    df = df.copy()
 
+    Notes
+    -----
+    ``df`` is not copied up front and may be modified in place: callers hand
+    over a frame they own (``process_silver_table`` passes the freshly read
+    silver table, ``synthesize_master_features`` its own copy).
+    """
     # 1. Temporal Standardization & Extrapolation
     if 'Perioden' in df.columns:
         # Defensive: cast to string in case SQLite round-trip changed the type
         # (e.g. when a column is entirely numeric-looking, pandas may infer int).
+        # The frequency masks are literal substring tests (regex=False skips the regex
+        # engine) computed once and reused for the row filters below.
         periods_str = df['Perioden'].astype(str)
-        has_kw = periods_str.str.contains('KW', na=False).any()
-        has_jj = periods_str.str.contains('JJ', na=False).any()
-        has_mm = periods_str.str.contains('MM', na=False).any()
+        is_kw = periods_str.str.contains('KW', regex=False, na=False)
+        is_jj = periods_str.str.contains('JJ', regex=False, na=False)
+        is_mm = periods_str.str.contains('MM', regex=False, na=False)
+        has_kw, has_jj, has_mm = is_kw.any(), is_jj.any(), is_mm.any()
         n_in = len(df)
 
         # Priority order: KW > MM > JJ.  This matters because CBS tables routinely
@@ -322,7 +364,7 @@ def apply_gold_baseline(
         # only fall back to yearly expansion when nothing finer exists.
         if has_kw:
             # Pure quarterly (or KW+JJ / KW+MM mix) — keep only KW rows.
-            df = df[df['Perioden'].astype(str).str.contains('KW', na=False)].copy()
+            df = df[is_kw].copy()
 
         elif has_mm:
             # Monthly → quarterly: aggregate the (up to) 3 monthly rows per quarter.
@@ -334,7 +376,7 @@ def apply_gold_baseline(
                 f"{n_in} input rows).",
                 c_type="warning",
             )
-            mm_df = df[df['Perioden'].astype(str).str.contains('MM', na=False)].copy()
+            mm_df = df[is_mm].copy()
             mm_df['_year']  = mm_df['Perioden'].astype(str).str[:4].astype(int)
             mm_df['_month'] = mm_df['Perioden'].astype(str).str[6:8].astype(int)
 
@@ -427,7 +469,7 @@ def apply_gold_baseline(
             f_log(f"Expanding yearly data to quarters (values repeated 4x{lag_label}).", c_type="warning")
             df_list = []
             for quarter in ['KW01', 'KW02', 'KW03', 'KW04']:
-                temp = df[df['Perioden'].astype(str).str.contains('JJ', na=False)].copy()
+                temp = df[is_jj].copy()
                 if lag_years:
                     # Shift year forward: 2022JJ00 with lag=1 → 2023KWxx
                     temp['Perioden'] = temp['Perioden'].apply(
@@ -457,17 +499,7 @@ def apply_gold_baseline(
             )
 
         # Datetime Parsing
-        def parse_quarter(val):
-            if pd.isna(val): return pd.NaT
-            parts = str(val).split('KW')
-            if len(parts) == 2:
-                try:
-                    return pd.Timestamp(year=int(parts[0]), month=int(parts[1])*3, day=1) + pd.offsets.MonthEnd(0)
-                except Exception:
-                    return pd.NaT
-            return pd.NaT
-
-        df['period_enddate'] = df['Perioden'].apply(parse_quarter)
+        df['period_enddate'] = parse_quarter_enddates(df['Perioden'])
 
 
 
@@ -843,7 +875,8 @@ def transform_target_fact_table(df: pd.DataFrame) -> pd.DataFrame:
     object_cols = df.select_dtypes(include=['object', 'string']).columns
     categorical_cols = [c for c in object_cols if c != 'period_enddate' and c != ML_TARGET_COLUMN and not re.search(r'_\d+$', c)]
     if categorical_cols:
-        df = pd.get_dummies(df, columns=categorical_cols, drop_first=False, dtype=int)
+        # uint8: one byte per 0/1 cell instead of eight (the quality gate in process_silver_table casts to float64 afterwards)
+        df = pd.get_dummies(df, columns=categorical_cols, drop_first=False, dtype=np.uint8)
     
     return df
 
@@ -856,6 +889,11 @@ TRANSFORMATION_REGISTRY = {
     "80072ned": transform_target_fact_table,
 }
 
+# Gold tables are built quarterly first, then yearly, then monthly. The master dataset joins the feature tables in
+# creation order, so this order fixes the master column order. The frequency lists partition the registry, so no
+# table appears twice.
+GOLD_BUILD_ORDER: tuple[str, ...] = (*CBS_TABLES_TO_LOAD, *CBS_TABLES_YEARLY, *CBS_TABLES_MONTHLY)
+
 # Auto-register yearly tables with their publication lag
 for _tid, _lag in CBS_TABLES_YEARLY.items():
     if _tid not in TRANSFORMATION_REGISTRY:
@@ -923,19 +961,12 @@ TRANSFORMATION_REGISTRY["85917NED"] = partial(
 if __name__ == "__main__":
     db = DatabaseGold(DIR_DB_SILVER, DIR_DB_GOLD)
 
-    # Dedup across the three frequency collections; a table id appearing in
-    # more than one (shouldn't happen, but be defensive) is processed once.
-    all_tables = list(dict.fromkeys(
-        list(CBS_TABLES_TO_LOAD)
-        + [t for t in CBS_TABLES_YEARLY if t not in CBS_TABLES_TO_LOAD]
-        + [t for t in CBS_TABLES_MONTHLY
-           if t not in CBS_TABLES_TO_LOAD and t not in CBS_TABLES_YEARLY]
-    ))
-    for table_id in all_tables:
+    for table_id in GOLD_BUILD_ORDER:
         if table_id in TRANSFORMATION_REGISTRY:
             db.process_silver_table(table_id, TRANSFORMATION_REGISTRY[table_id])
         else:
             f_log(f"Setup Warning: Transformation logic not registered for target table: {table_id}", c_type="warning")
 
     # Synthesize Master Dataset
-    db.create_master_training_dataset()
\ No newline at end of file
+    db.create_master_training_dataset()
+    db.engine.dispose()
\ No newline at end of file
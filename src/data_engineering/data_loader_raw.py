@@ -1,15 +1,18 @@
+import gzip
 import json
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # --- Third Party Libraries ---
 import cbsodata
+import pyarrow as pa
+import requests
+import pyarrow.parquet as pq
 
 # --- Configuration ---
-from src.config import DIR_DATA_RAW, CBS_TABLES_TO_LOAD, CBS_TABLES_YEARLY
-try:
-    from src.config import CBS_TABLES_MONTHLY
-except ImportError:
-    CBS_TABLES_MONTHLY: dict = {}
+from src.config import DIR_DATA_RAW, DIR_DB_BRONZE, CBS_TABLES_ALL
 
 # --- Logging ---
 from src.utils.m_log import f_log
@@ -17,14 +20,16 @@ from src.utils.m_log import f_log
 
 class CBSDataLoader:
     """
-    Responsible for retrieving data from CBS Open Data and storing it as raw JSON. It is an industry standard to save the raw JSON first, 
+    Responsible for retrieving data from CBS Open Data and storing it as raw files. It is an industry standard to save the raw data first, 
     hence creating a "Data Lake". This setup allows for re-processing raw data without re-querying the API—saving time and being a 
-    "good citizen" to the CBS servers.
+    "good citizen" to the CBS servers. Each (meta)data table is stored as a compressed, columnar Parquet file; a table whose values
+    cannot be typed by Arrow (mixed types within one column) falls back to a gzip-compressed JSON file so no raw data is ever lost.
     """
     
     def __init__(self, output_dir: str):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._table_list = None
 
     
     def _file_exists(self, file_dir: Path) -> bool:
@@ -32,13 +37,22 @@ class CBSDataLoader:
         if file_dir.exists():
             f_log(f"File '{file_dir}' already exists, data not fetched.")
             return True
+        return False
 
     
     def get_table_list(self) -> list:
-        """Fetches the list of available CBS tables."""
-        if self._file_exists(Path(self.output_dir, "cbs_table_list.json")):
-            return
-        
+        """
+        Returns the list of available CBS tables (Identifier, Title, ShortDescription). It is fetched from CBS once and
+        stored as cbs_table_list.json; later calls read that file, and the parsed list is cached on the loader.
+        """
+        if self._table_list is not None:
+            return self._table_list
+
+        output_path = Path(self.output_dir, "cbs_table_list.json")
+        if self._file_exists(output_path):
+            self._table_list = json.loads(output_path.read_bytes())
+            return self._table_list
+
         try:
             tables = cbsodata.get_table_list()
             f_log(f"Fetched {len(tables)} tables from CBS.", c_type="success")
@@ -50,11 +64,11 @@ class CBSDataLoader:
                 } for table in tables
             ]
 
-            output_path = Path(self.output_dir, "cbs_table_list.json")
-            with open(output_path, 'w') as f:
-                json.dump(table_info, f, indent=4)
+            # Compact separators: the full CBS catalog is several thousand entries, pretty-printing only inflates it.
+            output_path.write_text(json.dumps(table_info, separators=(",", ":")))
             f_log(f"Saved table list to: {output_path}", c_type="store")
-            return tables
+            self._table_list = table_info
+            return table_info
         
         except Exception as e:
             f_log(f"Failed to fetch table list: {e}", c_type="error")
@@ -62,31 +76,108 @@ class CBSDataLoader:
 
 
     def get_table(self, table_id: str) -> Path:
-        """Fetches a dataset from CBS by its Table ID and saves it to the output directory."""
+        """Fetches a dataset from CBS by its Table ID and saves each (meta)data table to the output directory."""
         output_dir_table = Path(self.output_dir, table_id)
         if self._file_exists(output_dir_table):
             return
        
         try:
             f_log(f"Getting data for table '{table_id}'...", c_type="debug")
-            data = cbsodata.get_data(table_id, dir=output_dir_table)
-            f_log(f"Saved table with {len(data)} records to {output_dir_table}", c_type="store")
+            tables = self._download_with_retry(table_id)
+            output_dir_table.mkdir(parents=True, exist_ok=True)
+            for table_name, records in tables.items():
+                save_raw_records(records, Path(output_dir_table, table_name))
+            n_records = len(tables.get("TypedDataSet", []))
+            f_log(f"Saved table with {n_records} records to {output_dir_table}", c_type="store")
             return output_dir_table
         
         except Exception as e:
             f_log(f"Failed to save data for table '{table_id}': {e}", c_type="error")
             raise
 
+    def _download_with_retry(self, table_id: str, retries: int = 3, backoff_seconds: float = 2.0) -> dict:
+        """
+        Downloads a CBS table, retrying transient (network/server) failures with exponential backoff (2s, 4s, ...).
+        Other errors (e.g. HTTP 404 for an unknown table id) are raised at once.
+        """
+        for attempt in range(1, retries + 1):
+            try:
+                return cbsodata.download_data(table_id)
+            except Exception as e:
+                if attempt == retries or not is_transient_error(e):
+                    raise
+                delay = backoff_seconds * 2 ** (attempt - 1)
+                f_log(f"Download of '{table_id}' failed (attempt {attempt}/{retries}): {e}. Retrying in {delay:.0f}s.", c_type="warning")
+                time.sleep(delay)
+
+    def get_tables(self, table_ids: list, max_workers: int = 8, on_table: Callable[[str], None] | None = None) -> None:
+        """
+        Fetches several CBS tables concurrently. Downloads are network-bound, so a small thread pool overlaps the
+        HTTPS round-trips. A failing table is logged without cancelling its peers; afterwards a RuntimeError lists
+        every failed download so the pipeline still aborts on incomplete raw data.
+
+        ``on_table`` (e.g. the bronze ingest) is called with each table id as soon as that table is on disk. It runs in
+        the calling thread, one table at a time, while the pool keeps downloading the remaining tables. An ``on_table``
+        error is only logged: the table itself is on disk, and the step that follows can still process it.
+        """
+        failed = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.get_table, table_id): table_id for table_id in table_ids}
+            for future in as_completed(futures):
+                table_id = futures[future]
+                try:
+                    future.result()
+                except Exception:
+                    failed.append(table_id)  # already logged by get_table
+                    continue
+                if on_table is None:
+                    continue
+                try:
+                    on_table(table_id)
+                except Exception as e:
+                    f_log(f"Processing downloaded table '{table_id}' failed: {e}", c_type="error")
+
+        if failed:
+            raise RuntimeError(f"Failed to fetch {len(failed)} CBS table(s): {sorted(failed)}")
+
+
+def is_transient_error(error: Exception) -> bool:
+    """True for failures worth retrying: connection errors, timeouts and HTTP 5xx responses."""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError):
+        # cbsodata re-raises HTTP errors without the response; the original error is chained as __cause__.
+        response = error.response if error.response is not None else getattr(error.__cause__, "response", None)
+        return response is not None and response.status_code >= 500
+    return False
+
+def save_raw_records(records: list, output_path: Path) -> Path:
+    """
+    Stores a list of CBS records as zstd-compressed Parquet, falling back to gzipped compact JSON when Arrow cannot type
+    a column. The gzip header carries no timestamp (mtime=0), so identical records always produce identical bytes.
+    Columns are the union of all record keys (e.g. only Topic rows of DataProperties carry Unit/Decimals), missing
+    values become nulls; ``pa.Table.from_pylist`` would take the columns from the first record only.
+    """
+    try:
+        parquet_path = output_path.with_suffix(".parquet")
+        keys = dict.fromkeys(key for record in records for key in record)
+        table = pa.table({key: pa.array([record.get(key) for record in records]) for key in keys})
+        pq.write_table(table, parquet_path, compression="zstd")
+        return parquet_path
+    except pa.ArrowException as e:
+        json_path = output_path.with_suffix(".json.gz")
+        f_log(f"Parquet conversion failed for '{output_path.name}' ({e}), storing as gzipped JSON.", c_type="warning")
+        payload = json.dumps(records, separators=(",", ":")).encode("utf-8")
+        json_path.write_bytes(gzip.compress(payload, compresslevel=3, mtime=0))
+        return json_path
+
 
 if __name__ == "__main__":
+    from src.data_engineering.data_loader_bronze import DatabaseBronze
+
     loader = CBSDataLoader(output_dir=DIR_DATA_RAW)
     loader.get_table_list()
-    # Dedup table IDs across the three frequency collections — a single table
-    # listed in two collections shouldn't be fetched twice.
-    all_tables = list(dict.fromkeys(
-        list(CBS_TABLES_TO_LOAD)
-        + list(CBS_TABLES_YEARLY)
-        + list(CBS_TABLES_MONTHLY)
-    ))
-    for table in all_tables:
-        loader.get_table(table)
\ No newline at end of file
+    # Ingest each table into bronze as soon as it is downloaded, overlapping the SQLite load with the remaining
+    # downloads; the bronze step that follows then skips these unchanged files via its ingest log.
+    bronze = DatabaseBronze(DIR_DATA_RAW, DIR_DB_BRONZE)
+    loader.get_tables(CBS_TABLES_ALL, on_table=bronze.ingest_0_raw_folder)
\ No newline at end of file
@@ -5,17 +5,20 @@ Implements the Star Schema strategy by joining Fact and Dimension tables from Br
 from pathlib import Path
 
 # --- Third Party Libraries ---
-from sqlalchemy import create_engine, MetaData, Table, Column, String, Integer, select, insert
+from sqlalchemy import MetaData, Table, Column, String, Integer, case, func, insert, or_, select
+from sqlalchemy.pool import StaticPool
 
 # --- Configuration ---
-from src.config import DIR_DB_BRONZE, DIR_DB_SILVER, CBS_TABLES_TO_LOAD, CBS_TABLES_YEARLY
-try:
-    from src.config import CBS_TABLES_MONTHLY
-except ImportError:
-    CBS_TABLES_MONTHLY: dict = {}
+from src.config import DIR_DB_BRONZE, DIR_DB_SILVER, CBS_TABLES_ALL
 
 # --- Logging ---
 from src.utils.m_log import f_log
+from src.utils.m_sqlite import create_sqlite_engine
+
+
+BRONZE_SCHEMA = "bronze"
+CRITICAL_COLUMNS = ['Ziekteverzuimpercentage_1', 'Perioden']
+FOREIGN_KEY_CANDIDATES = ("Key", "DimensionKey", "ID", "Code")
 
 
 def find_matching_column(table: Table, column_name: str):
@@ -25,36 +28,43 @@ def find_matching_column(table: Table, column_name: str):
 
 def find_foreign_key(table: Table):
     """Detects the Foreign Key column in a dimension table."""
-    candidates = ["Key", "DimensionKey", "ID", "Code"]
-    return next((table.c[c] for c in candidates if c in table.c), None)
-
-def apply_dim_join(query, fact_table: Table, dim_table: Table, identifier: str):
-    """Helper to find join keys and attach dimension columns to the query."""
-    dim_prefix = f"{identifier}_dim_"
-    dim_suffix = dim_table.name.replace(dim_prefix, "")
-    
+    return next((table.c[c] for c in FOREIGN_KEY_CANDIDATES if c in table.c), None)
+
+def resolve_join_keys(fact_table: Table, dim_table: Table, identifier: str) -> tuple[str, str] | None:
+    """Names of the (fact, dimension) columns a dimension table joins on, or None when it cannot be joined."""
+    dim_suffix = dim_table.name.replace(f"{identifier}_dim_", "")
     fk_col_fact = find_matching_column(fact_table, dim_suffix)
     fk_col_dim = find_foreign_key(dim_table)
+    if fk_col_fact is None or fk_col_dim is None:
+        return None
+    return fk_col_fact.name, fk_col_dim.name
+
+def apply_dim_join(query, fact_table: Table, dim_table: Table, identifier: str, join_keys: tuple[str, str] | None):
+    """Helper to join a dimension on its resolved ``join_keys`` and attach its columns to the query."""
+    if join_keys is None:
+        return query
+
+    dim_suffix = dim_table.name.replace(f"{identifier}_dim_", "")
+    fk_fact, fk_dim = join_keys
+    query = query.join(dim_table, fact_table.c[fk_fact] == dim_table.c[fk_dim], isouter=True)
+    for col in dim_table.c:
+        if col.name not in [fk_dim, "bronze_pk", "_source_file"]:
+            query = query.add_columns(col.label(f"{dim_suffix}_{col.name}"))
 
-    if fk_col_fact is not None and fk_col_dim is not None:
-        query = query.join(dim_table, fk_col_fact == fk_col_dim, isouter=True)
-        for col in dim_table.c:
-            if col.name not in [fk_col_dim.name, "bronze_pk", "_source_file"]:
-                query = query.add_columns(col.label(f"{dim_suffix}_{col.name}"))
-    
     return query
 
-def validate_silver_data(identifier: str, rows: list):
-    """Scans rows for missing data in critical columns and logs a soft error (warning)."""
-    critical_cols = ['Ziekteverzuimpercentage_1', 'Perioden']
-    missing_stats = {col: 0 for col in critical_cols}
-    
-    for row in rows:
-        row_dict = row._asdict()
-        for col in critical_cols:
-            if col in row_dict and (row_dict[col] is None or row_dict[col] == ''):
-                missing_stats[col] += 1
-
+def count_missing_critical(conn, table: Table) -> dict:
+    """Counts missing (NULL or empty) values per critical column of ``table`` in one aggregate query."""
+    critical = [table.c[col] for col in CRITICAL_COLUMNS if col in table.c]
+    if not critical:
+        return {}
+    counts = conn.execute(select(*[
+        func.coalesce(func.sum(case((or_(c.is_(None), c == ''), 1), else_=0)), 0).label(c.name) for c in critical
+    ])).one()
+    return dict(counts._mapping)
+
+def validate_silver_data(identifier: str, missing_stats: dict):
+    """Logs a soft error (warning) for every critical column with missing data."""
     for col, count in missing_stats.items():
         if count > 0:
             f_log(
@@ -78,8 +88,9 @@ class DatabaseSilver:
         if isinstance(self.db_silver_path, Path):
             self.db_silver_path.parent.mkdir(parents=True, exist_ok=True)
         
-        self.engine_bronze = create_engine(f"sqlite:///{self.db_bronze_path.as_posix()}")
-        self.engine_silver = create_engine(f"sqlite:///{self.db_silver_path.as_posix()}")
+        # Identifiers are processed one after another, so each database is served by a single reused connection.
+        self.engine_bronze = create_sqlite_engine(self.db_bronze_path, poolclass=StaticPool)
+        self.engine_silver = create_sqlite_engine(self.db_silver_path, poolclass=StaticPool)
         self.metadata_bronze = MetaData()
         self.metadata_silver = MetaData()
 
@@ -88,8 +99,14 @@ class DatabaseSilver:
         """Joins Fact and Dimensions for a given identifier and creates a Silver table."""
         f_log(f"Starting Silver transformation for CBS identifier: {identifier}", c_type="process")
 
-        # 1. Identify Fact Table
-        self.metadata_bronze.reflect(bind=self.engine_bronze)
+        # 1. Identify Fact Table: reflect only this identifier's fact and dimension tables, found via sqlite_master
+        # (GLOB, unlike LIKE, treats '_' literally and is case-sensitive).
+        with self.engine_bronze.connect() as conn:
+            table_names = conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND (name = ? OR name GLOB ?)",
+                (f"{identifier}_fact", f"{identifier}_dim_*"),
+            ).scalars().all()
+        self.metadata_bronze.reflect(bind=self.engine_bronze, only=table_names)
         fact_table = self.metadata_bronze.tables.get(f"{identifier}_fact")
         
         if fact_table is None:
@@ -100,49 +117,84 @@ class DatabaseSilver:
         # 2. Identify Dimension Tables
         dim_tables = [t for n, t in self.metadata_bronze.tables.items() if n.startswith(f"{identifier}_dim_")]
         f_log(f"Found {len(dim_tables)} dimension tables for {identifier}.")
-
-        # 3. Build Query: Start with Fact Table
+        # Join key names are resolved once per dimension and shared by the bronze index and the join; names rather than
+        # Column objects, as the join runs on schema-qualified copies of the tables.
+        join_keys = {dim_table.name: resolve_join_keys(fact_table, dim_table, identifier) for dim_table in dim_tables}
+        self._index_dimension_keys(dim_tables, join_keys)
+
+        # 3. Build Query: Start with Fact Table. The query addresses the bronze tables through the "bronze" schema
+        # under which the bronze DB is ATTACHed to the silver connection.
+        attached = MetaData()
+        fact_table = fact_table.to_metadata(attached, schema=BRONZE_SCHEMA)
         query = select(fact_table)
         for dim_table in dim_tables:
-            query = apply_dim_join(query, fact_table, dim_table, identifier)
+            query = apply_dim_join(
+                query, fact_table, dim_table.to_metadata(attached, schema=BRONZE_SCHEMA), identifier, join_keys[dim_table.name]
+            )
             f_log(f"Query after join {str(query)}.", c_type="debug")
         
         # 4. Process and Save
-        with self.engine_bronze.connect() as conn:
-            data = conn.execute(query).fetchall()
-            if data:
-                self._save_to_silver(identifier, data)
-
-    def _save_to_silver(self, identifier, rows):
-        """Handles table creation and bulk insertion into Silver layer."""
+        self._save_to_silver(identifier, query)
+
+    def _index_dimension_keys(self, dim_tables: list, join_keys: dict):
+        """
+        Indexes the join key of every dimension table in bronze, so each fact row probes the dimension through an index
+        instead of a scan. Bronze recreates its tables (and so drops the indexes) on re-ingest, hence IF NOT EXISTS here.
+        """
+        quote = self.engine_bronze.dialect.identifier_preparer.quote
+        with self.engine_bronze.begin() as conn:
+            for dim_table in dim_tables:
+                if join_keys[dim_table.name] is None:
+                    continue
+                fk_dim = join_keys[dim_table.name][1]
+                index_name = f"ix_{dim_table.name}_{fk_dim}"
+                conn.exec_driver_sql(
+                    f"CREATE INDEX IF NOT EXISTS {quote(index_name)} ON {quote(dim_table.name)} ({quote(fk_dim)})"
+                )
+
+    def _save_to_silver(self, identifier: str, query):
+        """
+        Handles table creation and bulk insertion into Silver layer.
+        The join runs inside SQLite as a single INSERT ... SELECT from the ATTACHed bronze DB, so rows never pass
+        through Python.
+        """
         silver_table_name = f"{identifier}_silver"
-
-        # --- SILVER VALIDATION GATE (Soft Error) ---
-        validate_silver_data(identifier, rows)
+        keys = list(query.selected_columns.keys())
 
         if silver_table_name in self.metadata_silver.tables:
             self.metadata_silver.remove(self.metadata_silver.tables[silver_table_name])
 
         cols = [Column("silver_id", Integer, primary_key=True, autoincrement=True)]
-        for key in rows[0]._fields:
+        for key in keys:
             if key != "silver_id":
                 cols.append(Column(key, String))
 
         silver_table = Table(silver_table_name, self.metadata_silver, *cols, extend_existing=True)
-        silver_table.drop(self.engine_silver, checkfirst=True)
-        silver_table.create(self.engine_silver)
 
-        with self.engine_silver.begin() as conn:
-            conn.execute(insert(silver_table), [row._asdict() for row in rows])
-            f_log(f"Loaded {len(rows)} rows into {silver_table_name}", c_type="success")
-            
+        with self.engine_silver.connect() as conn:
+            conn.exec_driver_sql(f"ATTACH DATABASE ? AS {BRONZE_SCHEMA}", (str(self.db_bronze_path),))
+            try:
+                silver_table.drop(conn, checkfirst=True)
+                silver_table.create(conn)
+                n_rows = conn.execute(insert(silver_table).from_select(keys, query)).rowcount
+                if n_rows == 0:
+                    silver_table.drop(conn)
+                    conn.commit()
+                    return
+                missing_stats = count_missing_critical(conn, silver_table)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.exec_driver_sql(f"DETACH DATABASE {BRONZE_SCHEMA}")
+        f_log(f"Loaded {n_rows} rows into {silver_table_name}", c_type="success")
+
+        # --- SILVER VALIDATION GATE (Soft Error) ---
+        validate_silver_data(identifier, missing_stats)
+
 
 if __name__ == "__main__":
     db = DatabaseSilver(DIR_DB_BRONZE, DIR_DB_SILVER)
-    all_tables = list(dict.fromkeys(
-        list(CBS_TABLES_TO_LOAD)
-        + list(CBS_TABLES_YEARLY)
-        + list(CBS_TABLES_MONTHLY)
-    ))
-    for table_id in all_tables:
+    for table_id in CBS_TABLES_ALL:
         db.create_silver_table(table_id)
\ No newline at end of file
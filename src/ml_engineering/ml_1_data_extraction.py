@@ -34,7 +34,7 @@ keeping all sectors and all OHE columns.  It reconstructs a categorical
 selection module, which needs cross-sector analysis.
 """
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 from sqlalchemy import create_engine
@@ -78,6 +78,39 @@ _DROP_ALWAYS = {"silver_id"}
 
 _STRUCTURAL_COLUMNS = _KEEP_STRUCTURAL | _DROP_ALWAYS
 
+# A full sweep extracts the same gold table once per model family × sector; the
+# table is read from SQLite once per process and served from this cache after
+# that.  Keyed on (db path, table) plus the modification times of the DB file
+# and its WAL, so a rebuilt gold store is re-read.
+_GOLD_TABLE_CACHE: Dict[Tuple, pd.DataFrame] = {}
+
+
+def _read_gold_table(engine, db_path: Path, table_name: str) -> pd.DataFrame:
+    """Read a gold table sorted by period_enddate (cached per process).
+
+    The returned frame is shared between callers and must not be modified in
+    place.  A DB path that does not exist on disk is read without caching.
+    """
+    db_path = Path(db_path)
+    wal_path = db_path.with_name(db_path.name + "-wal")
+    key = None
+    if db_path.exists():
+        key = (
+            db_path.resolve().as_posix(), table_name, db_path.stat().st_mtime_ns,
+            wal_path.stat().st_mtime_ns if wal_path.exists() else None,
+        )
+        if key in _GOLD_TABLE_CACHE:
+            return _GOLD_TABLE_CACHE[key]
+
+    df = pd.read_sql_table(table_name, engine)
+    df = df.sort_values(_DATE_COL).reset_index(drop=True)
+    if key is not None:
+        # Drop stale versions of the same table before caching the fresh read.
+        for stale in [k for k in _GOLD_TABLE_CACHE if k[:2] == key[:2]]:
+            del _GOLD_TABLE_CACHE[stale]
+        _GOLD_TABLE_CACHE[key] = df
+    return df
+
 
 class DataExtractor:
     """Extracts a feature subset from the Gold feature store."""
@@ -107,8 +140,7 @@ class DataExtractor:
             DataFrame with one row per quarter, sorted by period_enddate,
             containing the target + selected features.
         """
-        df = pd.read_sql_table(self.table_name, self.engine)
-        df = df.sort_values(_DATE_COL).reset_index(drop=True)
+        df = _read_gold_table(self.engine, self.db_path, self.table_name)
 
         # Apply SBI mode: filter / aggregate → 1 row per quarter
         df = self._apply_sbi_mode(df, sbi_filter_col, target_column)
@@ -199,8 +231,8 @@ class DataExtractor:
             ``sector`` column (e.g. ``"T001081"``, ``"301000"``).
         """
         engine = create_engine(f"sqlite:///{db_path.as_posix()}")
-        df = pd.read_sql_table(table_name, engine)
-        df = df.sort_values(_DATE_COL).reset_index(drop=True)
+        # Copy: the sector column below is added in place.
+        df = _read_gold_table(engine, db_path, table_name).copy()
 
         # Reconstruct sector identity from OHE columns.
         # Each row has exactly one OHE column == 1; idxmax finds it.
@@ -256,9 +256,11 @@ class ModelTrainer:
             )
             return
 
-        # sktime: pickle the forecaster, wrap in pyfunc for registry compatibility
+        # sktime: pickle the forecaster, wrap in pyfunc for registry compatibility.
+        # Protocol 5 (PEP 574) writes the NumPy buffers of fitted tree/regression
+        # arrays straight from memory instead of via intermediate bytes copies.
         with tempfile.NamedTemporaryFile(suffix=".pkl", delete=False) as f:
-            pickle.dump(fitted_model, f)
+            pickle.dump(fitted_model, f, protocol=pickle.HIGHEST_PROTOCOL)
             tmp_path = f.name
 
         try:
@@ -67,6 +67,7 @@ from src.utils.feature_selection_utils import (
     save_preset_to_json,
 )
 from src.utils.m_log import f_log
+from src.utils.m_sqlite import create_sqlite_engine
 
 
 # ---------------------------------------------------------------------------
@@ -149,7 +150,7 @@ def run_pipeline(
     # --- Infrastructure ---
     _configure_mlflow(DIR_DB_EVAL)
     DIR_DB_EVAL.parent.mkdir(parents=True, exist_ok=True)
-    engine = create_engine(f"sqlite:///{DIR_DB_EVAL.as_posix()}", connect_args={"timeout": 30})
+    engine = create_sqlite_engine(DIR_DB_EVAL, connect_args={"timeout": 30})
     _ensure_eval_db(engine)
 
     if not mlflow.get_experiment_by_name(experiment_name):
@@ -386,9 +387,7 @@ def run_forecast(
 
     _configure_mlflow(DIR_DB_EVAL)
     DIR_DB_EVAL.parent.mkdir(parents=True, exist_ok=True)
-    engine = create_engine(
-        f"sqlite:///{DIR_DB_EVAL.as_posix()}", connect_args={"timeout": 30}
-    )
+    engine = create_sqlite_engine(DIR_DB_EVAL, connect_args={"timeout": 30})
     _ensure_eval_db(engine)
     client = MlflowClient()
 
@@ -443,19 +442,26 @@ def _persist_forecasts(engine, forecasts) -> int:
             session.query(ModelForecastRecord).filter(
                 ModelForecastRecord.sector_code == sector
             ).delete()
-        for r in records:
-            session.add(ModelForecastRecord(
-                sector_code=str(r["sector_code"]),
-                model_family=r.get("model_family"),
-                model_type=r.get("model_type"),
-                experiment_key=r.get("experiment_key"),
-                champion_version=str(r.get("champion_version", "")),
-                forecast_made_on=r.get("origin_date"),
-                target_date=r.get("target_date"),
-                horizon=int(r["horizon"]),
-                y_pred=float(r["y_pred"]),
-                feature_catalog_hash=r.get("feature_catalog_hash") or "",
-            ))
+        # One bulk INSERT instead of a per-row ORM unit-of-work (same pattern
+        # as ml_5's model_predictions write).
+        session.bulk_insert_mappings(
+            ModelForecastRecord,
+            [
+                {
+                    "sector_code":          str(r["sector_code"]),
+                    "model_family":         r.get("model_family"),
+                    "model_type":           r.get("model_type"),
+                    "experiment_key":       r.get("experiment_key"),
+                    "champion_version":     str(r.get("champion_version", "")),
+                    "forecast_made_on":     r.get("origin_date"),
+                    "target_date":          r.get("target_date"),
+                    "horizon":              int(r["horizon"]),
+                    "y_pred":               float(r["y_pred"]),
+                    "feature_catalog_hash": r.get("feature_catalog_hash") or "",
+                }
+                for r in records
+            ],
+        )
         session.commit()
     return len(records)
 
@@ -203,7 +203,7 @@ def _f_load_sbi_reference(jsonld_path: Path) -> pd.DataFrame:
 
 def _f_load_cbs_dimension_lookup(dimension_json_path: Path) -> pd.DataFrame:
     """
-    Load a CBS SBI dimension JSON file and classify entries by Title regex.
+    Load a raw CBS SBI dimension table and classify entries by Title regex.
 
     CBS dimension tables use opaque internal keys (e.g. "T001081", "307500 ")
     rather than standard SBI codes. The Title field contains human-readable
@@ -218,17 +218,17 @@ def _f_load_cbs_dimension_lookup(dimension_json_path: Path) -> pd.DataFrame:
     Parameters
     ----------
     dimension_json_path : Path
-        Path to a CBS dimension JSON file (e.g. BedrijfskenmerkenSBI2008.json).
+        Path to a raw CBS dimension table as stored by the raw loader
+        (e.g. BedrijfskenmerkenSBI2008.parquet, or a .json.gz/.json file).
 
     Returns
     -------
     pd.DataFrame
         Lookup table with columns: Key, Title, sbi_level, sbi_section_letter.
     """
-    with open(dimension_json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    from src.data_engineering.data_loader_bronze import read_raw_table
 
-    df_lookup = pd.DataFrame(data)
+    df_lookup = read_raw_table(Path(dimension_json_path))
 
     # CBS keys often have trailing whitespace — strip it for reliable matching
     df_lookup["Key"] = df_lookup["Key"].astype(str).str.strip()
@@ -323,9 +323,10 @@ def f_split_by_sbi(
     sbi_column : str, default "BedrijfskenmerkenSBI2008"
         Name of the column containing SBI codes or CBS keys.
     dimension_json_path : Path or str or None, default None
-        Path to a CBS dimension JSON file. Only used when the column
-        contains CBS internal keys. If None, the function searches
-        ``config.DIR_DATA_RAW`` for a file matching ``{sbi_column}.json``.
+        Path to a raw CBS dimension table (.parquet, .json.gz or .json).
+        Only used when the column contains CBS internal keys. If None, the
+        function searches ``config.DIR_DATA_RAW`` for the ``{sbi_column}``
+        raw table.
     include_unmatched : bool, default True
         Whether to include rows that could not be matched to any SBI
         category. These are stored under the key ``"df__unmatched"``.
@@ -490,19 +491,24 @@ def _split_cbs_keys(
     include_unmatched: bool,
     helper_cols: list[str],
 ) -> "dict[str, pd.DataFrame]":
-    """Split by CBS internal keys using a CBS dimension JSON."""
+    """Split by CBS internal keys using a raw CBS dimension table."""
 
-    # Resolve dimension JSON path
+    # Resolve the dimension table path
     if dimension_json_path is not None:
         dim_path = Path(dimension_json_path)
     else:
-        # Auto-detect: search config.DIR_DATA_RAW for {sbi_column}.json
+        # Auto-detect: search config.DIR_DATA_RAW for the {sbi_column} raw table (.parquet/.json.gz/.json)
         if DIR_DATA_RAW is None:
             raise FileNotFoundError(
                 "config.DIR_DATA_RAW is not available and no dimension_json_path "
                 "was provided. Ensure config.py is accessible or pass the path explicitly."
             )
-        candidates = list(Path(DIR_DATA_RAW).rglob(f"{sbi_column}.json"))
+        from src.data_engineering.data_loader_bronze import raw_table_stem
+
+        candidates = [
+            path for path in Path(DIR_DATA_RAW).rglob(f"{sbi_column}.*")
+            if raw_table_stem(path) == sbi_column
+        ]
         if len(candidates) == 1:
             dim_path = candidates[0]
         elif len(candidates) > 1:
@@ -512,7 +518,7 @@ def _split_cbs_keys(
             )
         else:
             raise FileNotFoundError(
-                f"No '{sbi_column}.json' found under {DIR_DATA_RAW}. "
+                f"No '{sbi_column}' dimension table found under {DIR_DATA_RAW}. "
                 f"Ensure the raw data has been downloaded first."
             )
 
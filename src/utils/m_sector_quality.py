@@ -349,22 +349,21 @@ def to_tree(enriched_df) -> dict:
 def write_sector_performance(enriched_df, eval_db_path) -> int:
     """Materialise the enriched per-sector table into the ``sector_performance``
     read-model (replace semantics). Returns the number of rows written."""
-    from sqlalchemy import create_engine
     from sqlalchemy.orm import sessionmaker
     from src.ml_engineering.model_configs import Base, SectorPerformance
+    from src.utils.m_sqlite import create_sqlite_engine
 
-    engine = create_engine(
-        f"sqlite:///{Path(eval_db_path).as_posix()}", connect_args={"timeout": 30}
-    )
+    engine = create_sqlite_engine(eval_db_path, connect_args={"timeout": 30})
     Base.metadata.create_all(engine)
     cols = {c.name for c in SectorPerformance.__table__.columns}
     records = [] if (enriched_df is None or enriched_df.empty) else enriched_df.to_dict("records")
     try:
         with sessionmaker(bind=engine)() as session:
             session.query(SectorPerformance).delete()
-            for record in records:
-                payload = {k: _json_safe(v) for k, v in record.items() if k in cols}
-                session.add(SectorPerformance(**payload))
+            session.bulk_insert_mappings(
+                SectorPerformance,
+                [{k: _json_safe(v) for k, v in record.items() if k in cols} for record in records],
+            )
             session.commit()
     finally:
         engine.dispose()  # release the SQLite file handle (Windows-safe)
@@ -400,7 +399,8 @@ def refresh_sector_performance(
         eval_db_path = DIR_DB_EVAL
     if dimension_json_path is None:
         from src.config import DIR_DATA_RAW
-        dimension_json_path = Path(DIR_DATA_RAW) / "80072ned" / "BedrijfskenmerkenSBI2008.json"
+        from src.data_engineering.data_loader_bronze import find_raw_table
+        dimension_json_path = find_raw_table(Path(DIR_DATA_RAW) / "80072ned", "BedrijfskenmerkenSBI2008")
 
     mlflow.set_tracking_uri(f"sqlite:///{Path(eval_db_path).as_posix()}?timeout=30")
     quality = build_sector_quality_table(
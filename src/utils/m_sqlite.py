@@ -0,0 +1,42 @@
+"""
+Purpose:    SQLite engine factory for the medallion data stores (bronze/silver/gold)
+            and the writers of the evaluation DB.
+
+The loaders write each database once per ``--refresh-data`` run in large bulk
+transactions; the ML pipeline commits run, prediction and forecast records to
+the evaluation DB many times per run.  SQLite's defaults (rollback journal, ``synchronous=FULL``, ~2 MB
+page cache) make that fsync-bound, so every connection handed out by the engine
+is tuned for bulk loading:
+
+- ``journal_mode=WAL``     : writers append to the WAL instead of copying pages to a rollback journal
+- ``synchronous=NORMAL``   : fsync at checkpoints only (safe with WAL; a crash can lose the last commit, never corrupt)
+- ``temp_store=MEMORY``    : temp tables / sort spills stay in RAM
+- ``cache_size=-262144``   : 256 MB page cache (negative value = KiB)
+- ``mmap_size=268435456``  : 256 MB memory-mapped reads
+"""
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+SQLITE_BULK_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-262144",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def create_sqlite_engine(db_path: Path, **kwargs) -> Engine:
+    """Create a SQLAlchemy engine for ``db_path`` whose connections apply ``SQLITE_BULK_PRAGMAS``."""
+    engine = create_engine(f"sqlite:///{Path(db_path).as_posix()}", **kwargs)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_BULK_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return engine
@@ -29,6 +29,13 @@ class TestRegistry(unittest.TestCase):
                 f"{tid} ({freq}) must be in exactly one frequency list",
             )
 
+    def test_all_tables_is_the_deduplicated_union(self):
+        """Loaders iterate CBS_TABLES_ALL instead of re-deduplicating the three lists."""
+        union = set(config.CBS_TABLES_TO_LOAD) | set(config.CBS_TABLES_YEARLY) | set(config.CBS_TABLES_MONTHLY)
+        self.assertEqual(set(config.CBS_TABLES_ALL), union)
+        self.assertEqual(len(config.CBS_TABLES_ALL), len(union))
+        self.assertIsInstance(config.CBS_TABLES_ALL, tuple)
+
     def test_yearly_tables_carry_a_lag(self):
         self.assertIn("81628NED", config.CBS_TABLES_YEARLY)
         self.assertGreaterEqual(config.CBS_TABLES_YEARLY["81628NED"], 1)
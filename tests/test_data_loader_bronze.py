@@ -1,26 +1,144 @@
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
+import pandas as pd
 from pathlib import Path
-from src.data_engineering.data_loader_bronze import DatabaseBronze
+from sqlalchemy import Float, Integer, String, create_engine
+from src.data_engineering.data_loader_bronze import DatabaseBronze, clean_bronze_data, infer_column_type, raw_table_stem, read_raw_tables
 
 class TestDataLoaderBronze(unittest.TestCase):
     @patch("src.data_engineering.data_loader_bronze.Path.mkdir")
-    @patch("src.data_engineering.data_loader_bronze.create_engine")
+    @patch("src.data_engineering.data_loader_bronze.create_sqlite_engine")
     def setUp(self, mock_engine, mock_mkdir):
         self.raw_dir = Path("fake_raw")
         self.db_path = Path("fake_bronze.db")
         self.bronze = DatabaseBronze(self.raw_dir, self.db_path)
 
-    @patch("src.data_engineering.data_loader_bronze.DatabaseBronze.insert_json_data")
-    @patch("src.data_engineering.data_loader_bronze.Path.exists")
-    @patch("src.data_engineering.data_loader_bronze.Path.glob")
-    def test_ingest_0_raw_folder_success(self, mock_glob, mock_exists, mock_insert):
-        mock_exists.return_value = True
-        mock_glob.return_value = [Path("fake_raw/80072ned/TypedDataSet.json")]
-        
-        self.bronze.ingest_0_raw_folder("80072ned")
-        
-        mock_insert.assert_called_once()
+    def _raw_folder(self, tmp: str, files: dict) -> None:
+        self.bronze.data_raw_path = Path(tmp)
+        Path(tmp, "80072ned").mkdir()
+        for name, content in files.items():
+            Path(tmp, "80072ned", name).write_bytes(content)
+
+    def _loaded(self, rows: list) -> MagicMock:
+        conn = self.bronze.engine.begin.return_value.__enter__.return_value
+        conn.execute.return_value.all.return_value = rows
+        return conn
+
+    @patch("src.data_engineering.data_loader_bronze.DatabaseBronze.insert_raw_data")
+    @patch("src.data_engineering.data_loader_bronze.read_raw_table")
+    def test_ingest_0_raw_folder_success(self, mock_read, mock_insert):
+        mock_read.return_value = pd.DataFrame([{"ID": 0}])
+        conn = self._loaded([])
+        with tempfile.TemporaryDirectory() as tmp:
+            self._raw_folder(tmp, {"TypedDataSet.json": b"[]", "Empty.json": b"", "notes.txt": b"x"})
+
+            self.bronze.ingest_0_raw_folder("80072ned")
+
+        mock_insert.assert_called_once_with(conn, mock_read.return_value, "TypedDataSet.json", "80072ned_fact")
+
+    @patch("src.data_engineering.data_loader_bronze.DatabaseBronze.insert_raw_data")
+    @patch("src.data_engineering.data_loader_bronze.read_raw_table")
+    @patch("src.data_engineering.data_loader_bronze.file_sha256", return_value="abc")
+    def test_ingest_0_raw_folder_skips_unchanged_source(self, mock_sha, mock_read, mock_insert):
+        # Loaded in 2000, so the file is newer and gets hashed, but its content is unchanged.
+        self._loaded([("80072ned_fact", "abc", 2, "2000-01-01T00:00:00+00:00")])
+        with tempfile.TemporaryDirectory() as tmp:
+            self._raw_folder(tmp, {"TypedDataSet.json": b"[]"})
+
+            self.bronze.ingest_0_raw_folder("80072ned")
+
+        mock_sha.assert_called_once()
+        mock_read.assert_not_called()
+        mock_insert.assert_not_called()
+
+    @patch("src.data_engineering.data_loader_bronze.DatabaseBronze.insert_raw_data")
+    @patch("src.data_engineering.data_loader_bronze.file_sha256")
+    def test_ingest_0_raw_folder_skips_files_older_than_last_load_without_hashing(self, mock_sha, mock_insert):
+        self._loaded([("80072ned_fact", "abc", 2, "2999-01-01T00:00:00+00:00")])
+        with tempfile.TemporaryDirectory() as tmp:
+            self._raw_folder(tmp, {"TypedDataSet.json": b"[]"})
+
+            self.bronze.ingest_0_raw_folder("80072ned")
+
+        mock_sha.assert_not_called()
+        mock_insert.assert_not_called()
+
+    @patch("src.data_engineering.data_loader_bronze.DatabaseBronze.insert_raw_data")
+    @patch("src.data_engineering.data_loader_bronze.read_raw_table")
+    @patch("src.data_engineering.data_loader_bronze.file_sha256", return_value="def")
+    def test_ingest_0_raw_folder_hashes_restored_older_file_with_other_size(self, mock_sha, mock_read, mock_insert):
+        # A backup restored with its original (older) mtime: the size differs from the last load, so it is hashed.
+        mock_read.return_value = pd.DataFrame([{"ID": 0}])
+        conn = self._loaded([("80072ned_fact", "abc", 2, "2999-01-01T00:00:00+00:00")])
+        with tempfile.TemporaryDirectory() as tmp:
+            self._raw_folder(tmp, {"TypedDataSet.json": b'[{"ID": 0}]'})
+
+            self.bronze.ingest_0_raw_folder("80072ned")
+
+        mock_sha.assert_called_once()
+        mock_insert.assert_called_once_with(conn, mock_read.return_value, "TypedDataSet.json", "80072ned_fact")
+
+    def test_create_ingest_log_adds_size_column_to_existing_log(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{Path(tmp, 'bronze.db')}")
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    "CREATE TABLE _bronze_ingest_log (table_name VARCHAR PRIMARY KEY, source_sha256 VARCHAR, loaded_at VARCHAR)"
+                )
+                self.bronze._create_ingest_log(conn)
+                columns = [row[1] for row in conn.exec_driver_sql("PRAGMA table_info(_bronze_ingest_log)")]
+            engine.dispose()
+
+        self.assertEqual(columns, ["table_name", "source_sha256", "loaded_at", "source_size"])
+
+    def test_insert_raw_data_reingest_drops_columns_the_source_lost(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bronze = DatabaseBronze(Path(tmp), Path(tmp, "bronze.db"))
+            with bronze.engine.begin() as conn:
+                first = bronze.insert_raw_data(conn, pd.DataFrame([{"ID": 0, "Old": "a", "Value": 1}]), "TypedDataSet.json", "80072ned_fact")
+                second = bronze.insert_raw_data(conn, pd.DataFrame([{"ID": 0, "Value": 2}]), "TypedDataSet.json", "80072ned_fact")
+                columns = [row[1] for row in conn.exec_driver_sql('PRAGMA table_info("80072ned_fact")')]
+            bronze.engine.dispose()
+
+        self.assertTrue(first and second)
+        self.assertNotIn("Old", columns)
+        self.assertIn("Value", columns)
+
+    @patch("src.data_engineering.data_loader_bronze.read_raw_table")
+    def test_read_raw_tables_skips_unreadable_files(self, mock_read):
+        good, bad = Path("fake_raw/80072ned/TypedDataSet.parquet"), Path("fake_raw/80072ned/Perioden.parquet")
+        def fake_read(raw_path):
+            if raw_path == bad:
+                raise OSError("corrupt file")
+            return pd.DataFrame([{"ID": 0}])
+        mock_read.side_effect = fake_read
+
+        frames = read_raw_tables([good, bad])
+
+        self.assertEqual(list(frames), [good])
+
+    def test_raw_table_stem_strips_known_suffixes_only(self):
+        self.assertEqual(raw_table_stem(Path("TypedDataSet.parquet")), "TypedDataSet")
+        self.assertEqual(raw_table_stem(Path("Perioden.json.gz")), "Perioden")
+        self.assertEqual(raw_table_stem(Path("Perioden.json")), "Perioden")
+        self.assertIsNone(raw_table_stem(Path("notes.txt")))
+
+    def test_clean_bronze_data_strips_strings_and_adds_keys(self):
+        data = pd.DataFrame([{"ID": 0, "Perioden": " 2020KW01 ", "Value": 1.5}, {"ID": 1, "Perioden": None, "Value": 2}])
+
+        df = clean_bronze_data("TypedDataSet.json", data, "ID")
+
+        self.assertEqual(df["Perioden"].tolist(), ["2020KW01", None])
+        self.assertEqual(df["bronze_pk"].tolist(), ["TypedDataSet.json_0", "TypedDataSet.json_1"])
+        self.assertEqual(df["_source_file"].unique().tolist(), ["TypedDataSet.json"])
+
+    def test_infer_column_type_scans_whole_column(self):
+        # A leading None must not decide the type (CBS often starts a measure with missing values)
+        self.assertIs(infer_column_type(pd.Series([None, 1, 2], dtype=object)), Integer)
+        self.assertIs(infer_column_type(pd.Series([None, 1, 2.5], dtype=object)), Float)
+        self.assertIs(infer_column_type(pd.Series([1, "A"], dtype=object)), String)
+        self.assertIs(infer_column_type(pd.Series([None, None], dtype=object)), String)
 
 if __name__ == "__main__":
     unittest.main()
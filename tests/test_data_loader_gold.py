@@ -1,33 +1,88 @@
+import sqlite3
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from src.data_engineering.data_loader_gold import DatabaseGold, apply_gold_baseline, transform_generic_feature_table
+from src.config import CBS_TABLES_ALL, CBS_TABLES_MONTHLY, CBS_TABLES_TO_LOAD, CBS_TABLES_YEARLY
+from src.data_engineering.data_loader_gold import GOLD_BUILD_ORDER, DatabaseGold, apply_gold_baseline, parse_quarter_enddates, synthesize_master_features, transform_generic_feature_table
 
 class TestDataLoaderGold(unittest.TestCase):
-    @patch("src.data_engineering.data_loader_gold.create_engine")
+    @patch("src.data_engineering.data_loader_gold.create_sqlite_engine")
     def setUp(self, mock_engine):
         self.silver_path = Path("fake_silver.db")
         self.gold_path = Path("fake_gold.db")
         self.gold = DatabaseGold(self.silver_path, self.gold_path)
 
-    @patch("src.data_engineering.data_loader_gold.pd.read_sql_query")
-    @patch("src.data_engineering.data_loader_gold.pd.DataFrame.to_sql")
-    @patch("src.data_engineering.data_loader_gold.text")
-    def test_process_silver_table_success(self, mock_text, mock_to_sql, mock_read_sql):
-        mock_read_sql.return_value = pd.DataFrame({"feat": [1]})
-        
-        # DataFrame without NaNs
-        mock_transform = MagicMock(return_value=pd.DataFrame({"feat_gold": [1]}))
-        
-        mock_conn = MagicMock()
-        self.gold.engine.connect.return_value.__enter__.return_value = mock_conn
+    def test_process_silver_table_success(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            silver_path = Path(tmp, "silver_data.db")
+            with sqlite3.connect(silver_path) as silver:
+                silver.execute('CREATE TABLE "80072ned_silver" (feat INTEGER)')
+                silver.execute('INSERT INTO "80072ned_silver" VALUES (1)')
+            silver.close()
+            gold = DatabaseGold(silver_path, Path(tmp, "gold_data.db"))
+            # DataFrame without NaNs
+            mock_transform = MagicMock(side_effect=lambda df: df.rename(columns={"feat": "feat_gold"}))
 
-        self.gold.process_silver_table("80072ned", mock_transform)
-        
-        mock_transform.assert_called_once()
-        mock_to_sql.assert_called_once()
+            # Twice on the same (shared) connection: the silver DB must be detached again after each call.
+            gold.process_silver_table("80072ned", mock_transform)
+            gold.process_silver_table("80072ned", mock_transform)
+
+            self.assertEqual(mock_transform.call_count, 2)
+            with sqlite3.connect(gold.db_gold_path) as conn:
+                rows = conn.execute('SELECT feat_gold FROM "80072ned_gold"').fetchall()
+            conn.close()
+            gold.engine.dispose()
+            self.assertEqual(rows, [(1.0,)])
+
+    def test_process_silver_table_keeps_sqlalchemy_schema(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            silver_path = Path(tmp, "silver_data.db")
+            with sqlite3.connect(silver_path) as silver:
+                silver.execute('CREATE TABLE "80072ned_silver" (Perioden TEXT, feat INTEGER, label TEXT)')
+                silver.execute('INSERT INTO "80072ned_silver" VALUES (\'2020KW01\', 1, \'a\')')
+            silver.close()
+            gold = DatabaseGold(silver_path, Path(tmp, "gold_data.db"))
+            transform = lambda df: df.assign(period_enddate=parse_quarter_enddates(df.pop("Perioden")))
+
+            gold.process_silver_table("80072ned", transform)
+
+            with sqlite3.connect(gold.db_gold_path) as conn:
+                columns = conn.execute('PRAGMA table_info("80072ned_gold")').fetchall()
+                rows = conn.execute('SELECT feat, label, period_enddate FROM "80072ned_gold"').fetchall()
+            conn.close()
+            gold.engine.dispose()
+            self.assertEqual([(c[1], c[2]) for c in columns], [("feat", "FLOAT"), ("label", "TEXT"), ("period_enddate", "DATETIME")])
+            self.assertEqual(rows, [(1.0, "a", "2020-03-31 00:00:00.000000")])
+
+    def test_parse_quarter_enddates_maps_invalid_codes_to_nat(self):
+        periods = pd.Series(["2020KW01", "2021KW04", " 2022KW02 ", "2020KW05", "2020KW00", None, "2020JJ00"])
+
+        parsed = parse_quarter_enddates(periods)
+
+        self.assertEqual(
+            parsed.iloc[:3].tolist(),
+            [pd.Timestamp("2020-03-31"), pd.Timestamp("2021-12-31"), pd.Timestamp("2022-06-30")],
+        )
+        self.assertTrue(parsed.iloc[3:].isna().all())
+
+    def test_gold_build_order_is_quarterly_then_yearly_then_monthly(self):
+        self.assertEqual(GOLD_BUILD_ORDER, (*CBS_TABLES_TO_LOAD, *CBS_TABLES_YEARLY, *CBS_TABLES_MONTHLY))
+        self.assertEqual(sorted(GOLD_BUILD_ORDER), sorted(CBS_TABLES_ALL))
+
+    def test_master_feature_columns_follow_feature_table_order(self):
+        dates = pd.to_datetime(["2020-03-31", "2020-06-30"])
+        master_df = pd.DataFrame({"period_enddate": dates, "target": [1.0, 2.0]})
+        feature_dfs = {
+            "b_gold": pd.DataFrame({"period_enddate": dates, "feat_b": [1.0, 2.0]}),
+            "a_gold": pd.DataFrame({"period_enddate": dates, "feat_a": [3.0, 4.0]}),
+        }
+
+        master_df, _, _, _ = synthesize_master_features(master_df, feature_dfs, "target")
+
+        self.assertEqual(list(master_df.columns), ["period_enddate", "target", "feat_b", "feat_a"])
 
     def test_apply_gold_baseline(self):
         # Test temporal parsing and column dropping
@@ -1,7 +1,11 @@
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
+import pandas as pd
+import requests
 from pathlib import Path
-from src.data_engineering.data_loader_raw import CBSDataLoader
+from src.data_engineering.data_loader_raw import CBSDataLoader, save_raw_records
+from src.data_engineering.data_loader_bronze import read_raw_table
 
 class TestDataLoaderRaw(unittest.TestCase):
     @patch("src.data_engineering.data_loader_raw.Path.mkdir")
@@ -11,7 +15,7 @@ class TestDataLoaderRaw(unittest.TestCase):
 
     @patch("src.data_engineering.data_loader_raw.cbsodata.get_table_list")
     @patch("src.data_engineering.data_loader_raw.Path.exists")
-    @patch("builtins.open", new_callable=unittest.mock.mock_open)
+    @patch("src.data_engineering.data_loader_raw.Path.write_text")
     def test_get_table_list_success(self, mock_file, mock_exists, mock_get_list):
         # Mocking: file doesn't exist, API returns one table
         mock_exists.return_value = False
@@ -23,7 +27,20 @@ class TestDataLoaderRaw(unittest.TestCase):
         mock_get_list.assert_called_once()
         mock_file.assert_called()
 
-    @patch("src.data_engineering.data_loader_raw.cbsodata.get_data")
+    @patch("src.data_engineering.data_loader_raw.cbsodata.get_table_list")
+    def test_get_table_list_reads_existing_file_once(self, mock_get_list):
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "cbs_table_list.json").write_text('[{"Identifier": "80072ned"}]')
+            self.loader.output_dir = Path(tmp)
+
+            first = self.loader.get_table_list()
+            Path(tmp, "cbs_table_list.json").unlink()
+
+            self.assertEqual(first, [{"Identifier": "80072ned"}])
+            self.assertIs(self.loader.get_table_list(), first)
+        mock_get_list.assert_not_called()
+
+    @patch("src.data_engineering.data_loader_raw.cbsodata.download_data")
     @patch("src.data_engineering.data_loader_raw.Path.exists")
     def test_get_table_skips_if_exists(self, mock_exists, mock_get_data):
         mock_exists.return_value = True
@@ -33,5 +50,111 @@ class TestDataLoaderRaw(unittest.TestCase):
         # Should NOT call API if folder exists
         mock_get_data.assert_not_called()
 
+    @patch("src.data_engineering.data_loader_raw.CBSDataLoader.get_table")
+    def test_get_tables_hands_each_downloaded_table_to_on_table(self, mock_get_table):
+        def fake_get_table(table_id):
+            if table_id == "bad":
+                raise ValueError("CBS unavailable")
+        mock_get_table.side_effect = fake_get_table
+        processed = []
+
+        with self.assertRaises(RuntimeError):
+            self.loader.get_tables(["80072ned", "bad", "85920NED"], max_workers=2, on_table=processed.append)
+
+        # Only successfully downloaded tables are passed on
+        self.assertEqual(sorted(processed), ["80072ned", "85920NED"])
+
+    @patch("src.data_engineering.data_loader_raw.CBSDataLoader.get_table")
+    def test_get_tables_does_not_report_on_table_errors_as_failed_downloads(self, mock_get_table):
+        def failing_ingest(table_id):
+            raise ValueError("bronze ingest failed")
+
+        # All downloads succeed, so no RuntimeError although every on_table call fails
+        self.loader.get_tables(["80072ned", "85920NED"], max_workers=2, on_table=failing_ingest)
+
+        self.assertEqual(mock_get_table.call_count, 2)
+
+    @patch("src.data_engineering.data_loader_raw.time.sleep")
+    @patch("src.data_engineering.data_loader_raw.cbsodata.download_data")
+    def test_download_retries_with_exponential_backoff(self, mock_download, mock_sleep):
+        mock_download.side_effect = [
+            requests.exceptions.ConnectionError("reset"), requests.exceptions.Timeout("slow"), {"TypedDataSet": []},
+        ]
+
+        tables = self.loader._download_with_retry("80072ned", retries=3, backoff_seconds=2.0)
+
+        self.assertEqual(tables, {"TypedDataSet": []})
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [2.0, 4.0])
+
+    @patch("src.data_engineering.data_loader_raw.time.sleep")
+    @patch("src.data_engineering.data_loader_raw.cbsodata.download_data")
+    def test_download_retries_server_errors_but_not_client_errors(self, mock_download, mock_sleep):
+        def http_error(status_code):
+            # Shaped like cbsodata: the re-raised error has no response, the chained original has
+            original = requests.exceptions.HTTPError(response=MagicMock(status_code=status_code))
+            error = requests.exceptions.HTTPError(f"Downloading table failed. {status_code}")
+            error.__cause__ = original
+            return error
+
+        mock_download.side_effect = [http_error(503), {"TypedDataSet": []}]
+        self.assertEqual(self.loader._download_with_retry("80072ned"), {"TypedDataSet": []})
+
+        mock_download.side_effect = [http_error(404), {"TypedDataSet": []}]
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.loader._download_with_retry("nonexistent")
+        mock_download.side_effect = [ValueError("unexpected payload"), {"TypedDataSet": []}]
+        with self.assertRaises(ValueError):
+            self.loader._download_with_retry("80072ned")
+
+        # Only the 503 was retried
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @patch("src.data_engineering.data_loader_raw.CBSDataLoader.get_table")
+    def test_get_tables_fetches_all_and_reports_failures(self, mock_get_table):
+        def fake_get_table(table_id):
+            if table_id == "bad":
+                raise ValueError("CBS unavailable")
+        mock_get_table.side_effect = fake_get_table
+
+        with self.assertRaises(RuntimeError) as ctx:
+            self.loader.get_tables(["80072ned", "bad", "85920NED"], max_workers=2)
+
+        # A failing table does not cancel its peers
+        self.assertEqual(mock_get_table.call_count, 3)
+        self.assertIn("bad", str(ctx.exception))
+
+    def test_save_raw_records_parquet_round_trip(self):
+        records = [{"ID": 0, "Perioden": "2020KW01", "Value": None}, {"ID": 1, "Perioden": "2020KW02", "Value": 4.2}]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = save_raw_records(records, Path(tmp, "TypedDataSet"))
+
+            self.assertEqual(path.suffix, ".parquet")
+            pd.testing.assert_frame_equal(read_raw_table(path), pd.DataFrame(records))
+
+    def test_save_raw_records_keeps_keys_missing_from_the_first_record(self):
+        # DataProperties-shaped: only the Topic rows carry Unit/Decimals
+        records = [
+            {"ID": 0, "Type": "Dimension", "Key": "Perioden"},
+            {"ID": 1, "Type": "Topic", "Key": "Ziekteverzuim", "Unit": "%", "Decimals": 1},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = save_raw_records(records, Path(tmp, "DataProperties"))
+
+            df = read_raw_table(path)
+
+        self.assertEqual(path.suffix, ".parquet")
+        self.assertEqual(list(df.columns), ["ID", "Type", "Key", "Unit", "Decimals"])
+        self.assertEqual(df["Unit"].tolist(), [None, "%"])
+        self.assertEqual(df["Decimals"].tolist(), [None, 1])
+
+    def test_save_raw_records_falls_back_to_gzipped_json_on_mixed_types(self):
+        records = [{"Key": 1}, {"Key": "A"}]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = save_raw_records(records, Path(tmp, "Dimension"))
+
+            self.assertEqual(path.name, "Dimension.json.gz")
+            self.assertEqual(path.read_bytes(), save_raw_records(records, Path(tmp, "Dimension")).read_bytes())
+            pd.testing.assert_frame_equal(read_raw_table(path), pd.DataFrame(records))
+
 if __name__ == "__main__":
     unittest.main()
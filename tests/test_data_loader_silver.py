@@ -1,11 +1,13 @@
+import sqlite3
+import tempfile
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 from pathlib import Path
 from sqlalchemy import MetaData, Table, Column, String
 from src.data_engineering.data_loader_silver import DatabaseSilver
 
 class TestDataLoaderSilver(unittest.TestCase):
-    @patch("src.data_engineering.data_loader_silver.create_engine")
+    @patch("src.data_engineering.data_loader_silver.create_sqlite_engine")
     def setUp(self, mock_engine):
         self.bronze_path = Path("fake_bronze.db")
         self.silver_path = Path("fake_silver.db")
@@ -22,20 +24,38 @@ class TestDataLoaderSilver(unittest.TestCase):
             Column("Perioden", String)
         )
         self.silver.metadata_bronze.tables = {"80072ned_fact": fact_table}
-        
-        # Mock engine connection and result fetching
-        mock_conn = MagicMock()
-        mock_result = MagicMock()
-        mock_row = MagicMock()
-        mock_row._asdict.return_value = {"bronze_pk": "1", "Perioden": "2023"}
-        mock_row._fields = ["bronze_pk", "Perioden"]
-        mock_result.fetchall.return_value = [mock_row]
-        mock_conn.execute.return_value = mock_result
-        self.silver.engine_bronze.connect.return_value.__enter__.return_value = mock_conn
 
         self.silver.create_silver_table("80072ned")
-        
+
+        self.assertIn("only", mock_reflect.call_args.kwargs)
         mock_save.assert_called_once()
+        identifier, query = mock_save.call_args.args
+        self.assertEqual(identifier, "80072ned")
+        self.assertEqual(list(query.selected_columns.keys()), ["bronze_pk", "Perioden"])
+
+    def test_create_silver_table_joins_dimensions_inside_sqlite(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bronze_path, silver_path = Path(tmp, "bronze_data.db"), Path(tmp, "silver_data.db")
+            with sqlite3.connect(bronze_path) as bronze:
+                bronze.execute('CREATE TABLE "80072ned_fact" (bronze_pk TEXT PRIMARY KEY, "Perioden" TEXT, "Ziekteverzuimpercentage_1" REAL)')
+                bronze.execute('CREATE TABLE "80072ned_dim_Perioden" (bronze_pk TEXT PRIMARY KEY, "Key" TEXT, "Title" TEXT)')
+                bronze.executemany('INSERT INTO "80072ned_fact" VALUES (?, ?, ?)', [("f_0", "2023KW01", 4.5), ("f_1", "2023KW02", None)])
+                bronze.execute('INSERT INTO "80072ned_dim_Perioden" VALUES (\'d_0\', \'2023KW01\', \'2023 1e kwartaal\')')
+            bronze.close()
+            silver = DatabaseSilver(bronze_path, silver_path)
+
+            silver.create_silver_table("80072ned")
+
+            with sqlite3.connect(silver_path) as conn:
+                rows = conn.execute('SELECT "Perioden", "Ziekteverzuimpercentage_1", "Perioden_Title" FROM "80072ned_silver" ORDER BY silver_id').fetchall()
+            conn.close()
+            with sqlite3.connect(bronze_path) as conn:
+                indexes = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND sql IS NOT NULL")]
+            conn.close()
+            silver.engine_bronze.dispose()
+            silver.engine_silver.dispose()
+            self.assertEqual(rows, [("2023KW01", "4.5", "2023 1e kwartaal"), ("2023KW02", None, None)])
+            self.assertEqual(indexes, ["ix_80072ned_dim_Perioden_Key"])
 
 if __name__ == "__main__":
     unittest.main()
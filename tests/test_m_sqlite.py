@@ -0,0 +1,25 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlalchemy import text
+
+from src.utils.m_sqlite import create_sqlite_engine
+
+
+class TestCreateSqliteEngine(unittest.TestCase):
+    def test_connections_apply_bulk_pragmas(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_sqlite_engine(Path(tmp, "bulk.db"))
+            try:
+                with engine.connect() as conn:
+                    self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+                    self.assertEqual(conn.execute(text("PRAGMA synchronous")).scalar(), 1)  # NORMAL
+                    self.assertEqual(conn.execute(text("PRAGMA temp_store")).scalar(), 2)   # MEMORY
+                    self.assertEqual(conn.execute(text("PRAGMA cache_size")).scalar(), -262144)
+            finally:
+                engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,7 @@ _apply_sbi_mode always filters on that column in all-industry mode (default).
 In production the gold table always contains this national-total row.
 """
 
+import tempfile
 import unittest
 from unittest.mock import patch
 import pandas as pd
@@ -143,6 +144,27 @@ class TestDataExtraction(unittest.TestCase):
                 sbi_filter_col="BedrijfskenmerkenSBI2008_NONEXISTENT",
             )
 
+    @patch("src.ml_engineering.ml_1_data_extraction.create_engine")
+    @patch("src.ml_engineering.ml_1_data_extraction.pd.read_sql_table")
+    def test_extract_reads_gold_table_once_per_process(self, mock_read_sql, mock_engine):
+        """Repeated extractions (e.g. a sector sweep) reuse the cached gold table."""
+        mock_read_sql.return_value = _base_df(
+            feat1=[10, 20, 30, 40, 50],
+            BedrijfskenmerkenSBI2008_301000=[1] * _N,
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp, "gold_data.db")
+            db_path.touch()
+            extractor = DataExtractor(db_path, "gold_table")
+
+            extractor.extract(target_column="target")
+            extracted_df = extractor.extract(
+                target_column="target", sbi_filter_col="BedrijfskenmerkenSBI2008_301000"
+            )
+
+        mock_read_sql.assert_called_once()
+        self.assertEqual(len(extracted_df), _N)
+
     def test_derive_feature_columns_excludes_structural_ohe_and_sector(self):
         """derive_feature_columns is the single source of truth for feature columns:
         target, structural context, OHE indicators, and the synthetic sector
@@ -38,7 +38,7 @@ class TestPipeline(unittest.TestCase):
     @patch("src.ml_engineering.ml_orchestrator._ensure_eval_db")
     @patch("src.ml_engineering.ml_orchestrator._configure_mlflow")
     @patch("src.ml_engineering.ml_orchestrator.mlflow")
-    @patch("src.ml_engineering.ml_orchestrator.create_engine")
+    @patch("src.ml_engineering.ml_orchestrator.create_sqlite_engine")
     def test_pipeline_passes_gate(
         self, mock_engine, mock_mlflow, mock_configure, mock_ensure,
         mock_extractor_cls, mock_validator_cls, mock_preparator_cls,
@@ -69,7 +69,7 @@ class TestPipeline(unittest.TestCase):
     @patch("src.ml_engineering.ml_orchestrator._ensure_eval_db")
     @patch("src.ml_engineering.ml_orchestrator._configure_mlflow")
     @patch("src.ml_engineering.ml_orchestrator.mlflow")
-    @patch("src.ml_engineering.ml_orchestrator.create_engine")
+    @patch("src.ml_engineering.ml_orchestrator.create_sqlite_engine")
     def test_registry_name_is_sector_only_with_family_separate(
         self, mock_engine, mock_mlflow, mock_configure, mock_ensure,
         mock_extractor_cls, mock_validator_cls, mock_preparator_cls,
@@ -109,7 +109,7 @@ class TestPipeline(unittest.TestCase):
     @patch("src.ml_engineering.ml_orchestrator._ensure_eval_db")
     @patch("src.ml_engineering.ml_orchestrator._configure_mlflow")
     @patch("src.ml_engineering.ml_orchestrator.mlflow")
-    @patch("src.ml_engineering.ml_orchestrator.create_engine")
+    @patch("src.ml_engineering.ml_orchestrator.create_sqlite_engine")
     def test_pipeline_fails_gate(
         self, mock_engine, mock_mlflow, mock_configure, mock_ensure,
         mock_extractor_cls, mock_validator_cls, mock_preparator_cls,
@@ -402,7 +402,7 @@ class TestRunForecastWiring(unittest.TestCase):
     @patch("src.ml_engineering.ml_7_model_inference.forecast_all_champions")
     @patch("mlflow.tracking.MlflowClient")
     @patch("src.ml_engineering.ml_orchestrator._ensure_eval_db")
-    @patch("src.ml_engineering.ml_orchestrator.create_engine")
+    @patch("src.ml_engineering.ml_orchestrator.create_sqlite_engine")
     @patch("src.ml_engineering.ml_orchestrator._configure_mlflow")
     def test_persists_logs_tables_and_renders_when_champions_exist(
         self, mock_cfg, mock_engine, mock_ensure, mock_client_cls,
@@ -429,7 +429,7 @@ class TestRunForecastWiring(unittest.TestCase):
     @patch("src.ml_engineering.ml_7_model_inference.forecast_all_champions")
     @patch("mlflow.tracking.MlflowClient")
     @patch("src.ml_engineering.ml_orchestrator._ensure_eval_db")
-    @patch("src.ml_engineering.ml_orchestrator.create_engine")
+    @patch("src.ml_engineering.ml_orchestrator.create_sqlite_engine")
     @patch("src.ml_engineering.ml_orchestrator._configure_mlflow")
     def test_empty_registry_writes_nothing(
         self, mock_cfg, mock_engine, mock_ensure, mock_client_cls,
@@ -308,6 +308,22 @@ class TestSplitBySbiCbsKeys(unittest.TestCase):
         finally:
             dim_path.unlink()
 
+    def test_auto_detects_dimension_stored_by_raw_loader(self):
+        import tempfile
+        from src.data_engineering.data_loader_raw import save_raw_records
+        df = self._make_cbs_df()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            table_dir = Path(tmp_dir) / "80072ned"
+            table_dir.mkdir()
+            dim_path = save_raw_records(SAMPLE_CBS_DIMENSION, table_dir / "BedrijfskenmerkenSBI2008")
+            with patch("src.utils.m_sbi_classifier.DIR_DATA_RAW", tmp_dir):
+                result = f_split_by_sbi(df)
+
+        self.assertEqual(dim_path.suffix, ".parquet")
+        self.assertEqual(sum(len(v) for v in result.values()), len(df))
+        self.assertEqual(len(result["df_sector"]), 1)
+
 
 class TestSplitBySbiNumeric(unittest.TestCase):
     """Tests for f_split_by_sbi with numeric SBI codes."""